@@ -1,25 +1,148 @@
 #!/usr/bin/env python3
 
+import hashlib
+import icalendar
+import json
 import os
+import pickle
+import re
+import sys
 import requests
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from icalendar import Calendar, Event
-from icalendar.prop import vDatetime  # to force proper RFC 5545 formatting
+from icalendar.prop import vDate, vDatetime  # to force proper RFC 5545 formatting
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson  # much faster JSON decode, straight from bytes
+    json_loads = orjson.loads
+
+    def canonical_json(obj):
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+except ImportError:
+    json_loads = json.loads
+
+    # Not byte-identical to orjson for every value (e.g. 1e16, NaN); a
+    # mismatch only means the affected events get rebuilt once
+    def canonical_json(obj):
+        return json.dumps(
+            obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+        ).encode("utf-8")
+
+try:
+    from ciso8601 import parse_datetime as parse_iso_datetime  # handles "Z" natively
+except ImportError:
+    def parse_iso_datetime(dt_str):
+        # fromisoformat() only accepts a trailing "Z" from Python 3.11 on
+        return datetime.fromisoformat(dt_str.replace("Z", "+00:00"))
 
 ICS_FILENAME = "concert_schedule.ics"
+CAL_CACHE_FILENAME = ".concert_schedule.pkl"  # pickled Calendar of the .ics
+CAL_CACHE_VERSION = 2  # bump when the cached Calendar's layout changes
+UID_DOMAIN = "thenationalva.com"  # UIDs are "<eventId>@<UID_DOMAIN>"
 FEED_URL = "https://aegwebprod.blob.core.windows.net/json/events/51/events.json"
+FEED_CACHE_FILENAME = ".feed_cache.json"    # ETag / Last-Modified of last fetch
+FEED_EVENTS_FILENAME = ".feed_events.pkl"   # event list from last fetch
+FEED_TIMEOUT = 10  # seconds
+RENDER_VERSION = 1  # bump when create_or_update_ical_event's output changes
+DEFAULT_UTC = "2025-01-01T00:00:00"  # used when the feed omits modifiedUTC
+_EMPTY = {}  # shared read-only fallback for missing nested objects
 
-def fetch_events():
+# Raw VEVENT blocks and their UID line, for reusing unchanged events verbatim
+# (CRLF only, as RFC 5545 requires and as Event.to_ical() writes)
+_VEVENT_RE = re.compile(rb"^BEGIN:VEVENT\r\n.*?^END:VEVENT\r\n", re.M | re.S)
+_UID_RE = re.compile(rb"^UID(?:;[^:\r\n]*)?:(.*?)\r$", re.M)
+_FOLD_RE = re.compile(rb"\r\n[ \t]")
+
+# One pooled session for all feed requests, so repeated fetches (retries,
+# more venue feeds) reuse the TCP/TLS connection instead of reconnecting.
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_maxsize=10,
+    max_retries=Retry(total=3, backoff_factor=0.3),
+))
+_SESSION.headers["User-Agent"] = "schedule-pull (TheNationalVA ConcertSchedule)"
+# Ask for a compressed body; resp.content is already decompressed (zlib, in C)
+_SESSION.headers["Accept-Encoding"] = "gzip, deflate"
+_SESSION.headers["Accept"] = "application/json"
+
+def load_feed_cache():
+    """
+    Load the validators ({"etag": ..., "last_modified": ...}) saved by the
+    previous fetch. Returns an empty dict if there is nothing usable.
+    """
+    try:
+        with open(FEED_CACHE_FILENAME, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_feed_cache(validators, events):
+    """
+    Save the response validators and the parsed event list so the next run
+    can send a conditional GET and still recover the events on a 304.
+    Only call this once the events have been applied to the .ics, otherwise
+    a failed run would make the next one see a 304 and skip the update.
+    """
+    # Events first: validators without matching events would be useless
+    atomic_write(FEED_EVENTS_FILENAME,
+                 pickle.dumps(events, protocol=pickle.HIGHEST_PROTOCOL))
+    atomic_write(FEED_CACHE_FILENAME, json.dumps(validators).encode("utf-8"))
+
+def load_cached_events():
+    """
+    Load the event list saved with the validators.
+    Returns None if it is missing or unreadable.
+    """
+    try:
+        with open(FEED_EVENTS_FILENAME, "rb") as f:
+            return pickle.load(f)
+    except Exception:
+        # Only a cache => the caller fetches the full feed instead
+        return None
+
+def fetch_events(force=False):
     """
     Fetch all events from the AEG feed.
-    Returns a list of event dictionaries.
+    Returns (events, validators): events is a list of event dictionaries, or
+    None if the feed has not changed since the last fetch (HTTP 304).
+    With force=True, a 304 returns the cached event list instead of None.
+    validators ({"etag": ..., "last_modified": ...}) is None on a 304,
+    since the saved ones are still current.
     """
-    resp = requests.get(FEED_URL)
+    headers = {}
+    # Only send validators if we can still produce the events on a 304
+    if os.path.exists(FEED_EVENTS_FILENAME):
+        cache = load_feed_cache()
+        if cache.get("etag"):
+            headers["If-None-Match"] = cache["etag"]
+        if cache.get("last_modified"):
+            headers["If-Modified-Since"] = cache["last_modified"]
+
+    resp = _SESSION.get(FEED_URL, headers=headers, timeout=FEED_TIMEOUT)
+    if resp.status_code == 304:
+        if not force:
+            return None, None
+        events = load_cached_events()
+        if events is not None:
+            return events, None
+        # Cached events are unusable, so ask for the full feed again
+        resp = _SESSION.get(FEED_URL, timeout=FEED_TIMEOUT)
     resp.raise_for_status()  # Raise an exception if HTTP error
-    data = resp.json()
+    data = json_loads(resp.content)
     # data should have keys: "meta" and "events"
     # "events" is the list of all event objects
-    return data["events"]
+    validators = {
+        "etag": resp.headers.get("ETag"),
+        "last_modified": resp.headers.get("Last-Modified"),
+    }
+    return data["events"], validators
+
+# 24-hour clock hour => 12-hour clock hour / "AM"/"PM" (avoids strftime("%p"))
+_HOUR12 = (12,) + tuple(range(1, 12)) + (12,) + tuple(range(1, 12))
+_AMPM = ("AM",) * 12 + ("PM",) * 12
 
 def format_time_no_leading_zero(dt: datetime) -> str:
     """
@@ -28,41 +151,46 @@ def format_time_no_leading_zero(dt: datetime) -> str:
       - Zero-padded minutes
       - AM/PM
     """
-    hour_12 = dt.hour % 12
-    if hour_12 == 0:
-        hour_12 = 12
-    minute_str = f"{dt.minute:02d}"  # zero-pad minutes
-    ampm_str = dt.strftime("%p")     # "AM" or "PM"
-    return f"{hour_12}:{minute_str} {ampm_str}"
+    h = dt.hour
+    return f"{_HOUR12[h]}:{dt.minute:02d} {_AMPM[h]}"
 
+@lru_cache(maxsize=8192)
 def from_iso(dt_str):
     """
     Convert an ISO formatted string to a timezone-aware datetime in UTC.
     Assumes the input is in UTC.
+    Cached: feeds repeat the same timestamps across many events.
     """
     # Parse the string to a datetime object
-    dt = datetime.fromisoformat(dt_str)
+    dt = parse_iso_datetime(dt_str)
     # Force it to be UTC (if it's not already timezone-aware)
     if dt.tzinfo is None:
         dt = dt.replace(tzinfo=timezone.utc)
     return dt
 
-def create_or_update_ical_event(event_data, ical_event=None):
+def create_or_update_ical_event(event_data, ical_event=None, uid_value=None):
     """
     Create a new VEVENT or update an existing one (if ical_event is provided).
     Uses all-day (date-based) DTSTART/DTEND.
+    uid_value is the event's UID if the caller already built it.
     """
     if ical_event is None:
         ical_event = Event()
 
+    # Nested feed objects, looked up once
+    title = event_data["title"]
+    venue = event_data["venue"]
+    assoc = event_data.get("associations") or _EMPTY
+    headliners = assoc.get("headliners") or ()
+
     # 1) UID
-    event_id = event_data["eventId"]  # e.g. "765964"
-    uid_value = f"{event_id}@thenationalva.com"
+    if uid_value is None:
+        event_id = event_data["eventId"]  # e.g. "765964"
+        uid_value = f"{event_id}@{UID_DOMAIN}"
     ical_event["UID"] = uid_value
 
-    # 2) created/modified times => DTSTAMP + LAST-MODIFIED
-    created_str = event_data.get("createdUTC", "2025-01-01T00:00:00")
-    modified_str = event_data.get("modifiedUTC", "2025-01-01T00:00:00")
+    # 2) modified time => DTSTAMP + LAST-MODIFIED
+    modified_str = event_data.get("modifiedUTC", DEFAULT_UTC)
     dt_modified = from_iso(modified_str)
     ical_event["DTSTAMP"] = vDatetime(dt_modified)
     ical_event["LAST-MODIFIED"] = vDatetime(dt_modified)
@@ -72,22 +200,20 @@ def create_or_update_ical_event(event_data, ical_event=None):
     show_dt = from_iso(show_dt_str)
     start_date = show_dt.date()
     end_date = (show_dt + timedelta(days=1)).date()
-    # Remove any previous DTSTART/DTEND entries if updating
-    if "DTSTART" in ical_event:
-        del ical_event["DTSTART"]
-    if "DTEND" in ical_event:
-        del ical_event["DTEND"]
-    # Add with proper parameters for date-only values
-    ical_event.add("DTSTART", start_date, parameters={"VALUE": "DATE"})
-    ical_event.add("DTEND", end_date, parameters={"VALUE": "DATE"})
+    # Build the date-only values directly instead of going through add()'s
+    # type guessing; assignment replaces any previous DTSTART/DTEND
+    dtstart = vDate(start_date)
+    dtstart.params["VALUE"] = "DATE"
+    ical_event["DTSTART"] = dtstart
+    dtend = vDate(end_date)
+    dtend.params["VALUE"] = "DATE"
+    ical_event["DTEND"] = dtend
 
     # 4) SUMMARY (Title)
-    ical_event["SUMMARY"] = event_data["title"]["eventTitleText"]
+    ical_event["SUMMARY"] = title["eventTitleText"]
 
     # 5) LOCATION (Venue)
-    venue_title = event_data["venue"]["title"]
-    venue_address = event_data["venue"]["address_line"]
-    ical_event["LOCATION"] = f"{venue_title}, {venue_address}"
+    ical_event["LOCATION"] = f"{venue['title']}, {venue['address_line']}"
 
     # 6) DESCRIPTION lines
     desc_lines = []
@@ -102,12 +228,11 @@ def create_or_update_ical_event(event_data, ical_event=None):
     desc_lines.append(f"Show: {format_time_no_leading_zero(show_dt)}")
 
     # Support (if available)
-    supporting_text = event_data["title"].get("supportingText")
+    supporting_text = title.get("supportingText")
     if supporting_text:
         desc_lines.append(f"Support: {supporting_text}")
 
     # under21 => false => All Ages; true => 21+ Only, plus genre info
-    headliners = event_data.get("associations", {}).get("headliners", [])
     if headliners:
         hl = headliners[0]
         under21 = hl.get("under21", False)
@@ -124,18 +249,138 @@ def create_or_update_ical_event(event_data, ical_event=None):
 
     return ical_event
 
+def feed_hash(event_data):
+    """
+    Digest of the event's feed payload and RENDER_VERSION, stored on the
+    VEVENT as X-FEED-HASH so an unchanged event can be recognised without
+    rebuilding it, while a rendering change still rebuilds every event.
+    """
+    h = hashlib.blake2b(b"%d:" % RENDER_VERSION, digest_size=16)
+    h.update(canonical_json(event_data))
+    return h.hexdigest()
+
+def is_up_to_date(event_data, ical_event, event_hash):
+    """
+    True if ical_event already reflects event_data: its X-FEED-HASH matches
+    event_hash or, for events written before the hash existed, its
+    LAST-MODIFIED matches the feed's modifiedUTC.
+    """
+    stored_hash = ical_event.get("X-FEED-HASH")
+    if stored_hash is not None:
+        return str(stored_hash) == event_hash
+    # Events from before X-FEED-HASH were rendered like RENDER_VERSION 1
+    if RENDER_VERSION != 1:
+        return False
+    last_modified = ical_event.get("LAST-MODIFIED")
+    if last_modified is None:
+        return False
+    return last_modified.dt == from_iso(event_data.get("modifiedUTC", DEFAULT_UTC))
+
+def split_ics(raw):
+    """
+    Split raw .ics bytes into (header, {event_id: vevent_bytes}, footer),
+    keeping the VEVENTs in file order. event_id is the UID before the "@".
+    Returns None if the file has any bare LF line ending, anything between
+    VEVENTs or a VEVENT without a UID; the caller then serializes the whole
+    calendar instead.
+    """
+    # Spliced-in events use CRLF, so the rest of the file must too
+    if raw.count(b"\n") != raw.count(b"\r\n"):
+        return None
+    raw_events = {}
+    pos = None
+    for m in _VEVENT_RE.finditer(raw):
+        if pos is None:
+            header = raw[:m.start()]
+        elif m.start() != pos:
+            return None
+        chunk = m.group()
+        uid = _UID_RE.search(_FOLD_RE.sub(b"", chunk))
+        if uid is None:
+            return None
+        raw_events[uid.group(1).split(b"@", 1)[0].decode("utf-8")] = chunk
+        pos = m.end()
+    if pos is None:
+        return None
+    return header, raw_events, raw[pos:]
+
+def atomic_write(path, data):
+    """
+    Write bytes to path via a temporary file + os.replace(), so a crash or a
+    concurrent reader never sees a truncated file.
+    """
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)  # one write() of the whole payload
+    os.replace(tmp_path, path)
+
+def calendar_cache_header(raw):
+    """
+    Header pickled ahead of the cached Calendar: the cache is only valid for
+    these exact .ics bytes, this CAL_CACHE_VERSION and icalendar release.
+    mtimes are not enough, since cp -p, rsync -t or a git checkout can put an
+    older .ics next to a newer cache.
+    """
+    digest = hashlib.blake2b(raw, digest_size=16).digest()
+    return (CAL_CACHE_VERSION, icalendar.__version__, digest)
+
+def load_calendar_cache(raw):
+    """
+    Return the pickled Calendar if it was saved for the .ics content raw,
+    else None.
+    """
+    try:
+        with open(CAL_CACHE_FILENAME, "rb") as f:
+            # Check the header before unpickling the Calendar itself, so a
+            # cache from another icalendar release is never loaded
+            if pickle.load(f) != calendar_cache_header(raw):
+                return None
+            return pickle.load(f)
+    except Exception:
+        # Only a cache: missing, damaged or unloadable (e.g. a pickled tzinfo
+        # whose module is gone) => just parse the .ics again
+        return None
+
+def save_calendar_cache(cal, raw):
+    """
+    Pickle cal next to the .ics so the next run can skip Calendar.from_ical().
+    raw is the .ics content cal corresponds to.
+    """
+    data = pickle.dumps(calendar_cache_header(raw), protocol=pickle.HIGHEST_PROTOCOL)
+    data += pickle.dumps(cal, protocol=pickle.HIGHEST_PROTOCOL)
+    atomic_write(CAL_CACHE_FILENAME, data)
+
 def main():
     """
-    - Loads existing concert_schedule.ics or creates new.
-    - Fetches all events from feed.
+    - Fetches all events from feed (exits early if the feed is unchanged).
+    - Loads existing concert_schedule.ics (or its pickled cache) or creates new.
     - For each event in feed, add/update in ICS.
     - Does NOT remove old events => they remain in the .ics.
-    - Writes updated .ics.
+    - Writes updated .ics (only if something changed).
     """
-    # 1) Load or create calendar
-    if os.path.exists(ICS_FILENAME):
+    # A brand-new calendar always has to be written out
+    dirty = not os.path.exists(ICS_FILENAME)
+
+    # 1) Fetch all events from feed, before touching the calendar, so the
+    # common "feed unchanged" run does no calendar work at all
+    # No .ics on disk yet means we must build one, even from a 304
+    all_events, validators = fetch_events(force=dirty)
+    if all_events is None:
+        print(f"Feed '{FEED_URL}' unchanged since last run. Nothing to do.")
+        return
+    print(f"Fetched {len(all_events)} events from feed '{FEED_URL}'.")
+
+    # 2) Load or create calendar
+    raw = None
+    cal_cache_stale = True
+    if not dirty:
         with open(ICS_FILENAME, "rb") as f:
-            cal = Calendar.from_ical(f.read())
+            raw = f.read()
+        cal = load_calendar_cache(raw)
+        if cal is None:
+            cal = Calendar.from_ical(raw)
+        else:
+            cal_cache_stale = False
         print(f"Loaded existing '{ICS_FILENAME}'.")
     else:
         cal = Calendar()
@@ -146,30 +391,81 @@ def main():
         print(f"No existing '{ICS_FILENAME}' found. Created a new one.")
 
     existing_events = {}
-    for component in cal.walk("VEVENT"):
+    vevent_count = 0
+    # VEVENTs are direct children of VCALENDAR, so no recursive walk() needed
+    for component in cal.subcomponents:
+        if component.name != "VEVENT":
+            continue
+        # Key by the bare eventId so feed lookups need no UID formatting
         uid = str(component.get("UID"))
-        existing_events[uid] = component
-
-    # 2) Fetch all events from feed
-    all_events = fetch_events()
-    print(f"Fetched {len(all_events)} events from feed '{FEED_URL}'.")
+        existing_events[uid.split("@", 1)[0]] = component
+        vevent_count += 1
 
     # 3) Add or update events in the calendar
-    for evt_data in all_events:
-        uid_value = f"{evt_data['eventId']}@thenationalva.com"
-        if uid_value in existing_events:
-            vevent = existing_events[uid_value]
-            create_or_update_ical_event(evt_data, vevent)
-            print(f"Updated event => UID: {uid_value}")
-        else:
-            new_vevent = create_or_update_ical_event(evt_data)
-            cal.add_component(new_vevent)
-            existing_events[uid_value] = new_vevent
-            print(f"Added new event => UID: {uid_value}")
+    # Classify feed events up front; both lists keep feed order so new
+    # events are appended deterministically
+    feed_by_id = {str(evt_data["eventId"]): evt_data for evt_data in all_events}
+    update_ids = [event_id for event_id in feed_by_id if event_id in existing_events]
+    add_ids = [event_id for event_id in feed_by_id if event_id not in existing_events]
+
+    changed = {}  # eventId => VEVENT that needs re-serializing
+    event_log = []  # per-event lines, written in one go after the loops
+    for event_id in update_ids:
+        evt_data = feed_by_id[event_id]
+        event_hash = feed_hash(evt_data)
+        vevent = existing_events[event_id]
+        if is_up_to_date(evt_data, vevent, event_hash):
+            continue
+        uid_value = f"{event_id}@{UID_DOMAIN}"
+        create_or_update_ical_event(evt_data, vevent, uid_value)
+        vevent["X-FEED-HASH"] = event_hash
+        changed[event_id] = vevent
+        event_log.append(f"Updated event => UID: {uid_value}\n")
+    updated_count = len(changed)
+
+    for event_id in add_ids:
+        evt_data = feed_by_id[event_id]
+        uid_value = f"{event_id}@{UID_DOMAIN}"
+        new_vevent = create_or_update_ical_event(evt_data, uid_value=uid_value)
+        new_vevent["X-FEED-HASH"] = feed_hash(evt_data)
+        cal.add_component(new_vevent)
+        changed[event_id] = new_vevent
+        event_log.append(f"Added new event => UID: {uid_value}\n")
+
+    if changed:
+        dirty = True
+    event_log.append(f"Updated {updated_count}, added {len(add_ids)} events.\n")
+    sys.stdout.write("".join(event_log))
 
     # 4) Write updated ICS
-    with open(ICS_FILENAME, "wb") as f:
-        f.write(cal.to_ical())
+    if not dirty:
+        if cal_cache_stale:
+            save_calendar_cache(cal, raw)
+        if validators is not None:
+            save_feed_cache(validators, all_events)
+        print(f"No changes to '{ICS_FILENAME}'. Nothing to write.\nDone!")
+        return
+    ics_parts = None if raw is None else split_ics(raw)
+    # Only splice raw bytes if they line up one-to-one with the loaded events
+    if ics_parts is not None and (
+        len(ics_parts[1]) != vevent_count
+        or ics_parts[1].keys() != existing_events.keys()
+    ):
+        ics_parts = None
+    if ics_parts is None:
+        data = cal.to_ical()
+    else:
+        # Reuse the on-disk bytes of untouched events; serialize only the
+        # changed ones (new events land at the end, as add_component does)
+        header, raw_events, footer = ics_parts
+        for event_id, vevent in changed.items():
+            raw_events[event_id] = vevent.to_ical()
+        data = b"".join([header, *raw_events.values(), footer])
+    atomic_write(ICS_FILENAME, data)
+    save_calendar_cache(cal, data)
+    # Only now is it safe to answer the next run's conditional GET with a 304
+    if validators is not None:
+        save_feed_cache(validators, all_events)
 
     print(f"Saved updated '{ICS_FILENAME}'. Past events remain.\nDone!")
 